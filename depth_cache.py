@@ -0,0 +1,228 @@
+## import libraries
+
+import os
+import fire
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from roc_cache import CACHE_DIR, CACHE_ENABLED, CACHE_MAX_BYTES, cache_key, evict
+
+## samtools depth output - chrom, 1-based position, depth - read with compact dtypes, a chunk at a time
+
+DEPTH_COLUMNS = ["chrom", "position", "depth"]
+DEPTH_DTYPES = {"chrom": 'category', "position": np.int32, "depth": np.uint32}
+
+
+def iter_depth(filename, chunksize=1000000):
+    '''Yield (chrom, positions, depths) arrays for each run of one chromosome within a chunk of a depth file.'''
+
+    reader = pd.read_csv(filename, sep='\t', header=None, names=DEPTH_COLUMNS, dtype=DEPTH_DTYPES, chunksize=chunksize)
+
+    ## depth files are grouped by chromosome, so split each chunk at the rows where the chromosome changes
+
+    for chunk in reader:
+        codes = chunk["chrom"].cat.codes.to_numpy()
+        names = chunk["chrom"].cat.categories
+        positions = chunk["position"].to_numpy()
+        depths = chunk["depth"].to_numpy()
+
+        edges = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1, [len(codes)]))
+        for start, end in zip(edges[:-1], edges[1:]):
+            yield str(names[codes[start]]), positions[start:end], depths[start:end]
+
+
+## binary depth cache - one dense uint16/uint32 .npy per chromosome plus an index of (chrom, offset, length, file, present)
+## entries share ROC_CACHE_DIR and its size cap with the ROC score cache; when a depth file skips positions (samtools depth
+## without -a) a packed presence mask is stored too, so the cache streams exactly the rows the text file has
+
+class ChromWriter:
+    '''Scratch depth and presence arrays for one chromosome, indexed by position and grown as rows arrive.
+
+    The scratch files are extended with truncate, so untouched stretches stay
+    sparse on disk; the text file is parsed only once.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self.low = None
+        self.high = -1
+        self.deepest = 0
+
+    def grow(self, size):
+        for suffix, dtype in ((".depth", np.uint32), (".present", np.uint8)):
+            with open(self.path + suffix, 'ab') as handle:
+                handle.truncate(size * np.dtype(dtype).itemsize)
+
+        self.size = size
+        self.depth = np.memmap(self.path + ".depth", dtype=np.uint32, mode='r+', shape=(size,))
+        self.present = np.memmap(self.path + ".present", dtype=np.uint8, mode='r+', shape=(size,))
+
+    def add(self, positions, depths):
+        high = int(positions.max())
+        if high >= self.size:
+            self.grow(max(high + 1, 2 * self.size))
+
+        self.depth[positions] = depths
+        self.present[positions] = 1
+
+        low = int(positions.min())
+        self.low = low if self.low is None else min(self.low, low)
+        self.high = max(self.high, high)
+        self.deepest = max(self.deepest, int(depths.max()))
+
+    def finish(self, entry, name, block=1 << 24):
+        '''Copy positions low..high into name.npy at the smallest dtype, plus a packed presence mask if any are missing.
+
+        Returns (offset, length, mask file name or "").
+        '''
+
+        length = self.high - self.low + 1
+        dtype = np.uint16 if self.deepest <= np.iinfo(np.uint16).max else np.uint32
+        depth = np.lib.format.open_memmap(os.path.join(entry, name + ".npy"), mode='w+', dtype=dtype, shape=(length,))
+
+        missing = 0
+        for start in range(0, length, block):
+            end = min(start + block, length)
+            depth[start:end] = self.depth[self.low + start:self.low + end]
+            missing += (end - start) - int(np.count_nonzero(self.present[self.low + start:self.low + end]))
+        depth.flush()
+
+        mask = ""
+        if missing:
+            mask = name + "_present.npy"
+            present = np.lib.format.open_memmap(os.path.join(entry, mask), mode='w+', dtype=np.uint8, shape=((length + 7) // 8,))
+            for start in range(0, length, block):
+                end = min(start + block, length)
+                present[start // 8:(end + 7) // 8] = np.packbits(self.present[self.low + start:self.low + end])
+            present.flush()
+
+        del self.depth, self.present
+        os.remove(self.path + ".depth")
+        os.remove(self.path + ".present")
+
+        return self.low, length, mask
+
+
+def build_cache(filename, entry):
+    '''Convert a depth file into a cache entry in one streaming pass.'''
+
+    writers = {}
+    for chrom, positions, depths in iter_depth(filename):
+        if chrom not in writers:
+            writers[chrom] = ChromWriter(os.path.join(entry, "scratch_" + str(len(writers))))
+        writers[chrom].add(positions, depths)
+
+    index = []
+    for i, (chrom, writer) in enumerate(writers.items()):
+        offset, length, mask = writer.finish(entry, str(i))
+        index.append((chrom, offset, length, str(i) + ".npy", mask))
+
+    pd.DataFrame(index, columns=["chrom", "offset", "length", "file", "present"]).to_csv(os.path.join(entry, "index.tsv"), sep='\t', index=False)
+
+
+def open_entry(entry):
+    '''Memory-map every array of a cache entry into {chrom: (offset, depth, packed presence mask or None)}.'''
+
+    index = pd.read_csv(os.path.join(entry, "index.tsv"), sep='\t', dtype={"chrom": str, "present": str}, keep_default_na=False)
+
+    arrays = {}
+    for chrom, offset, name, mask in index[["chrom", "offset", "file", "present"]].itertuples(index=False):
+        present = np.load(os.path.join(entry, mask), mmap_mode='r') if mask else None
+        arrays[chrom] = (int(offset), np.load(os.path.join(entry, name), mmap_mode='r'), present)
+
+    return arrays
+
+
+def read_depth_cache(filename, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    '''Return {chrom: (offset, depth array, presence mask)} for a depth file, memory-mapped from the cache and built on first read.
+
+    depth[i] is the depth at position offset + i, so any region is a slice.
+    The presence mask (packed bits, None when no position is missing) marks
+    the positions that have a row in the depth file.
+    '''
+
+    entry = os.path.join(cache_dir, cache_key(filename, 'depth_v2', np.uint32))
+
+    try:
+        arrays = open_entry(entry)
+        os.utime(entry)
+        return arrays
+    except (FileNotFoundError, ValueError):
+        pass
+
+    ## build in a temporary directory and map it before renaming it into place - the maps stay valid whatever happens to the
+    ## directory afterwards, and eviction skips the new entry, so a file bigger than the cap is still read once
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir, prefix='.staging_')
+    build_cache(filename, staging)
+    arrays = open_entry(staging)
+
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    evict(cache_dir, max_bytes, keep=entry)
+
+    return arrays
+
+
+def iter_cached_depth(filename, chunksize=1 << 20):
+    '''Same (chrom, positions, depths) stream as iter_depth, read from the binary cache.
+
+    Positions the depth file has no row for are skipped, so binning and
+    summaries see exactly what the text path sees.
+    '''
+
+    chunksize = max(8, chunksize - chunksize % 8)
+
+    for chrom, (offset, depth, present) in read_depth_cache(filename).items():
+        for start in range(0, len(depth), chunksize):
+            values = np.asarray(depth[start:start + chunksize])
+            positions = np.arange(offset + start, offset + start + len(values), dtype=np.int64)
+
+            if present is not None:
+                keep = np.unpackbits(present[start // 8:(start + len(values) + 7) // 8])[:len(values)].astype(bool)
+                positions, values = positions[keep], values[keep]
+
+            if len(values):
+                yield chrom, positions, values
+
+
+def load_depth(filename, cache=CACHE_ENABLED):
+    '''Stream a depth file, going through the binary cache unless it is turned off.'''
+
+    return iter_cached_depth(filename) if cache else iter_depth(filename)
+
+
+def region_depth(filename, chrom, start, end):
+    '''Depth at positions start..end (1-based, inclusive) of one chromosome, read as a slice of the cached array.
+
+    Positions outside the stretch the depth file covers, or without a row in it, come back as 0.
+    '''
+
+    offset, depth, _ = read_depth_cache(filename)[chrom]
+    start, end = int(start), int(end)
+
+    values = np.zeros(max(end - start + 1, 0), dtype=depth.dtype)
+    low, high = max(start, offset), min(end, offset + len(depth) - 1)
+    if low <= high:
+        values[low - start:high - start + 1] = depth[low - offset:high - offset + 1]
+
+    return values
+
+
+## define function to print the depth over a region - e.g. python depth_cache.py sample.txt 16s1_extended 700 760
+
+def region(filename, chrom, start, end):
+    depths = region_depth(filename, str(chrom), start, end)
+    print(pd.DataFrame({"chrom": chrom, "position": np.arange(int(start), int(start) + len(depths)), "depth": depths}).to_csv(sep='\t', index=False), end='')
+
+    return
+
+
+if __name__ == '__main__':
+  fire.Fire(region)
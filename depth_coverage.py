@@ -0,0 +1,287 @@
+import os
+import fire
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from depth_cache import CACHE_ENABLED, load_depth
+
+## bin depth into fixed windows per chromosome - sums, counts, minima and maxima grow with the genome, not the file
+
+class DepthBins:
+    '''Per-chromosome mean/min/max depth over windows of `window` bases, filled chunk by chunk.'''
+
+    def __init__(self, window=10):
+        self.window = int(window)
+        self.bins = {}
+
+    def add(self, chrom, positions, depths):
+        index = (np.asarray(positions, dtype=np.int64) - 1) // self.window
+        if len(index) == 0:
+            return
+
+        size = int(index.max()) + 1
+        total, count, low, high = self.bins.get(chrom, (np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)))
+
+        if size > len(total):
+            grow = size - len(total)
+            total = np.concatenate((total, np.zeros(grow)))
+            count = np.concatenate((count, np.zeros(grow, dtype=np.int64)))
+            low = np.concatenate((low, np.full(grow, np.iinfo(np.uint32).max, dtype=np.uint32)))
+            high = np.concatenate((high, np.zeros(grow, dtype=np.uint32)))
+
+        total[:size] += np.bincount(index, weights=depths, minlength=size)
+        count[:size] += np.bincount(index, minlength=size)
+
+        ## sorted positions (samtools output and the binary cache) take one reduceat per bin run instead of the slower ufunc.at
+
+        if np.all(index[1:] >= index[:-1]):
+            heads = np.concatenate(([0], np.flatnonzero(index[1:] != index[:-1]) + 1))
+            bins = index[heads]
+            low[bins] = np.minimum(low[bins], np.minimum.reduceat(depths, heads))
+            high[bins] = np.maximum(high[bins], np.maximum.reduceat(depths, heads))
+        else:
+            np.minimum.at(low, index, depths)
+            np.maximum.at(high, index, depths)
+
+        self.bins[chrom] = (total, count, low, high)
+
+    def table(self, max_bins=None):
+        '''One row per non-empty window (chrom, start, end, mean, min, max); max_bins merges neighbouring windows to cap the rows per chromosome.'''
+
+        tables = []
+        for chrom, (total, count, low, high) in self.bins.items():
+            width = self.window
+            if max_bins is not None and len(total) > max_bins:
+                factor = -(-len(total) // int(max_bins))
+                heads = np.arange(0, len(total), factor)
+                total, count = np.add.reduceat(total, heads), np.add.reduceat(count, heads)
+                low, high = np.minimum.reduceat(low, heads), np.maximum.reduceat(high, heads)
+                width *= factor
+
+            filled = np.flatnonzero(count)
+            tables.append(pd.DataFrame({
+                "chrom": chrom,
+                "start": filled * width + 1,
+                "end": (filled + 1) * width,
+                "mean": total[filled] / count[filled],
+                "min": low[filled],
+                "max": high[filled],
+            }))
+
+        if not tables:
+            return pd.DataFrame(columns=["chrom", "start", "end", "mean", "min", "max"])
+
+        return pd.concat(tables, ignore_index=True)
+
+
+def bin_depth(filename, window=10, max_bins=4000, cache=CACHE_ENABLED):
+    '''Stream a depth file (or its binary cache) into binned mean/min/max depth.'''
+
+    bins = DepthBins(window)
+    for chrom, positions, depths in load_depth(filename, cache):
+        bins.add(chrom, positions, depths)
+    return bins.table(max_bins)
+
+
+## per-sample QC in one streaming pass - a running depth histogram for mean/median/breadth and run-length low-coverage intervals
+
+class DepthSummary:
+    '''Constant-memory coverage statistics for one depth file.
+
+    Positions missing between two rows of the same chromosome (samtools depth
+    without -a) count as depth 0. A low-coverage interval is a run of positions
+    below min_depth; runs are carried across chunk boundaries.
+    '''
+
+    def __init__(self, min_depth=10, breadths=(1, 10, 30)):
+        self.min_depth = int(min_depth)
+        self.breadths = tuple(int(b) for b in breadths)
+        self.histogram = np.zeros(max(self.breadths + (self.min_depth,)) + 1, dtype=np.int64)
+        self.intervals = []
+        self.chrom = None
+        self.last = None
+        self.open = None
+
+    def close(self):
+        if self.open is not None:
+            self.intervals.append((self.chrom, self.open, self.last))
+        self.open = None
+
+    def add(self, chrom, positions, depths):
+        positions = np.asarray(positions, dtype=np.int64)
+        depths = np.asarray(depths)
+        if len(positions) == 0:
+            return
+
+        if chrom != self.chrom:
+            self.close()
+            self.chrom, self.last = chrom, None
+
+        counts = np.bincount(depths)
+        if len(counts) > len(self.histogram):
+            self.histogram = np.concatenate((self.histogram, np.zeros(len(counts) - len(self.histogram), dtype=np.int64)))
+        self.histogram[:len(counts)] += counts
+
+        ## tile the chunk with one segment per row and one zero-depth segment per gap, then find runs of low segments
+
+        previous = np.concatenate(([positions[0] - 1 if self.last is None else self.last], positions[:-1]))
+        gaps = np.flatnonzero(positions - previous > 1)
+        self.histogram[0] += int(np.sum(positions[gaps] - previous[gaps] - 1))
+
+        starts = np.concatenate((positions, previous[gaps] + 1))
+        ends = np.concatenate((positions, positions[gaps] - 1))
+        low = np.concatenate((depths < self.min_depth, np.ones(len(gaps), dtype=bool)))
+        order = np.argsort(starts, kind='stable')
+        starts, ends, low = starts[order], ends[order], low[order]
+
+        heads = np.flatnonzero(low & ~np.concatenate(([False], low[:-1])))
+        tails = np.flatnonzero(low & ~np.concatenate((low[1:], [False])))
+
+        if len(heads) and heads[0] == 0 and self.open is not None:
+            run_starts = np.concatenate(([self.open], starts[heads[1:]]))
+        else:
+            self.close()
+            run_starts = starts[heads]
+
+        self.open = None
+        for start, tail in zip(run_starts, tails):
+            if tail == len(low) - 1:
+                self.open = int(start)
+            else:
+                self.intervals.append((chrom, int(start), int(ends[tail])))
+
+        self.last = int(positions[-1])
+
+    def finish(self):
+        '''Close any open interval and return (statistics dict, intervals dataframe).'''
+
+        self.close()
+
+        depths = np.arange(len(self.histogram))
+        n = int(self.histogram.sum())
+        cumulative = np.cumsum(self.histogram)
+        stats = {"positions": n}
+
+        if n:
+            middle = np.searchsorted(cumulative, [(n - 1) // 2, n // 2], side='right')
+            stats["mean_depth"] = float(np.dot(depths, self.histogram) / n)
+            stats["median_depth"] = float(middle.mean())
+        else:
+            stats["mean_depth"] = stats["median_depth"] = float('nan')
+
+        for b in self.breadths:
+            stats["breadth_" + str(b) + "x"] = float(self.histogram[b:].sum() / n) if n else float('nan')
+
+        intervals = pd.DataFrame(self.intervals, columns=["chrom", "start", "end"])
+        intervals["length"] = intervals["end"] - intervals["start"] + 1
+        stats["low_coverage_intervals"] = len(intervals)
+        stats["low_coverage_bases"] = int(intervals["length"].sum())
+
+        return stats, intervals
+
+
+def summarise_file(file_directory, min_depth=10, cache=CACHE_ENABLED):
+    '''Stream one depth file into its summary row and low-coverage intervals.'''
+
+    summary = DepthSummary(min_depth)
+    for chrom, positions, depths in load_depth(file_directory, cache):
+        summary.add(chrom, positions, depths)
+
+    stats, intervals = summary.finish()
+    sample = os.path.basename(file_directory)
+    intervals.insert(0, "sample", sample)
+
+    return dict(sample=sample, **stats), intervals
+
+
+## plot binned depth - mean line over a min-max band per chromosome, on a figure that is cleared after every file
+
+def plot_depth(table, output, fig):
+    ax = fig.add_subplot()
+
+    try:
+        for chrom, group in table.groupby("chrom", sort=False):
+            middle = (group["start"].to_numpy() + group["end"].to_numpy()) / 2
+            line, = ax.plot(middle, group["mean"].to_numpy(), drawstyle='steps-mid', label=chrom)
+            ax.fill_between(middle, group["min"].to_numpy(), group["max"].to_numpy(), step='mid', color=line.get_color(), alpha=0.2)
+
+        ax.set_yscale('log')
+        ax.set_xlabel('position')
+        ax.set_ylabel('depth')
+        ax.set_title("Coverage Plot")
+        ax.grid(True, alpha=0.3)
+        if table["chrom"].nunique() > 1:
+            ax.legend()
+
+        fig.savefig(output)
+    finally:
+        fig.clf()
+
+    return output
+
+
+## one figure per worker process, reused for every file that worker plots
+
+FIGURE = None
+
+
+def plot_file(file_directory, output, window=10, max_bins=4000, cache=CACHE_ENABLED):
+    global FIGURE
+    if FIGURE is None:
+        FIGURE = plt.figure(figsize=(24, 6))
+
+    return plot_depth(bin_depth(file_directory, window, max_bins, cache), output, FIGURE)
+
+
+def is_fresh(file_directory, output):
+    '''True when the plot exists and is newer than its depth file.'''
+
+    return os.path.exists(output) and os.path.getmtime(output) > os.path.getmtime(file_directory)
+
+
+## define function to plot every depth file in a directory across a process pool, skipping plots newer than their depth file
+## e.g. python depth_coverage.py /data/bhargava/combinedrnamods/allfastqs/alldepths/ --workers=16 --window=100; --force replots everything
+## depth files are converted to memory-mapped binary arrays under ROC_CACHE_DIR on first read (see depth_cache.py); --cache=False reads the text
+
+def depth_directory(directory: str, workers=None, window=10, max_bins=4000, output_dir='.', force=False, summary=None, min_depth=10, cache=CACHE_ENABLED):
+    '''Loop files in the directory to produce coverage plots'''
+
+    if summary is not None:
+        return summary_directory(directory, summary, workers, min_depth, cache)
+
+    jobs = []
+    for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".txt"):
+                file_directory = os.path.join(directory, filename)
+                output = os.path.join(output_dir, str(filename) + ".pdf")
+                if force or not is_fresh(file_directory, output):
+                    jobs.append((file_directory, output))
+
+    print(str(len(jobs)) + " depth files to plot")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for output in executor.map(plot_file, *zip(*jobs), [window] * len(jobs), [max_bins] * len(jobs), [cache] * len(jobs)):
+            print(output)
+
+## summary mode - one TSV row per sample (mean/median depth, breadth at 1x/10x/30x) plus every interval below min_depth in <summary>_low_coverage.tsv
+## e.g. python depth_coverage.py /data/bhargava/combinedrnamods/allfastqs/alldepths/ --summary=coverage_summary.tsv --min_depth=10
+
+def summary_directory(directory, summary='coverage_summary.tsv', workers=None, min_depth=10, cache=CACHE_ENABLED):
+    filenames = [os.path.join(directory, filename) for filename in sorted(os.listdir(directory)) if filename.endswith(".txt")]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(summarise_file, filenames, [min_depth] * len(filenames), [cache] * len(filenames)))
+
+    pd.DataFrame([stats for stats, _ in results]).to_csv(summary, sep='\t', index=False)
+    print(summary)
+
+    low_coverage = os.path.splitext(summary)[0] + "_low_coverage.tsv"
+    if results:
+        pd.concat([intervals for _, intervals in results], ignore_index=True).to_csv(low_coverage, sep='\t', index=False)
+        print(low_coverage)
+
+if __name__=='__main__':
+        fire.Fire(depth_directory)
@@ -0,0 +1,171 @@
+## import libraries
+
+import os
+import re
+import numpy as np
+import pandas as pd
+
+## ROC file names carry the window size and labelling mode
+
+def window_tag(w, mode='exact'):
+    '''Window part of a ROC file name - "2nt" for exact offsets, "2nt_full" for the whole window.'''
+
+    return str(w) + ("nt" if mode == 'exact' else "nt_full")
+
+
+## input adapters - map each tool's output to a (position, score) array pair and keep the tool's ROC file naming
+
+class ToolAdapter:
+    '''Streams a tool's output in chunks, keeping only the position and score columns.
+
+    Subclasses set the separator, header handling, the two column names and
+    whether the score is a p-value to take log10 of. Only those two columns
+    are parsed (usecols) with explicit dtypes, so peak memory scales with two
+    numeric columns rather than the whole table.
+    '''
+
+    name = None
+    sep = ','
+    header = 'infer'
+    columns = None
+    position_column = None
+    score_column = None
+    log10 = False
+
+    def iter_chunks(self, filename, chunksize=1000000, score_dtype=np.float64):
+        '''Yield (int32 positions, score_dtype scores) one chunk at a time, with log10 already applied.'''
+
+        reader = pd.read_csv(filename, sep=self.sep, header=0 if self.columns and self.header == 'infer' else self.header, names=self.columns,
+                             usecols=[self.position_column, self.score_column], dtype={self.position_column: np.int32, self.score_column: score_dtype},
+                             chunksize=chunksize)
+
+        for chunk in reader:
+            score = chunk[self.score_column].to_numpy()
+            if self.log10:
+                with np.errstate(divide='ignore'):
+                    score = np.log10(score)
+            yield chunk[self.position_column].to_numpy(), score
+
+    def read(self, filename, chunksize=1000000, score_dtype=np.float64):
+        '''Return int32 positions and score_dtype scores (float64 by default, float32 to halve memory).'''
+
+        positions = []
+        scores = []
+        for position, score in self.iter_chunks(filename, chunksize, score_dtype):
+            positions.append(position)
+            scores.append(score)
+
+        if not positions:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=score_dtype)
+
+        return np.concatenate(positions), np.concatenate(scores)
+
+
+class NanodocAdapter(ToolAdapter):
+    '''nanoDoc tab-separated output, scored on the raw `score` column.
+
+    The first line is consumed as a header and the columns renamed, as the
+    original nanodoc ROC scripts did.
+    '''
+
+    name = 'nanodoc'
+    sep = '\t'
+    columns = ['position', '5mer', 'depth_tgt', 'depth_ref', 'med_current', 'mad_current', 'med_currentR', 'mad_currentR', 'current_ratio', 'scoreSide1', 'scoreSide2', 'score']
+    position_column = 'position'
+    score_column = 'score'
+
+    def output_name(self, filename, w, mode='exact'):
+        return filename + "_roc_" + window_tag(w, mode) + "_window.tsv"
+
+
+class TomboAdapter(ToolAdapter):
+    '''CSV dumped from tombo LevelStats, scored on log10 of `stat`.'''
+
+    name = 'tombo'
+    position_column = 'pos'
+    score_column = 'stat'
+    log10 = True
+
+    def output_name(self, filename, w, mode='exact'):
+        directory, base = os.path.split(filename)
+        return os.path.join(directory, "roc_" + window_tag(w, mode) + "_window_" + base)
+
+
+class XporeAdapter(ToolAdapter):
+    '''xpore diffmod table, scored on log10 of `pval_KO_vs_WT`.'''
+
+    name = 'xpore'
+    position_column = 'position'
+    score_column = 'pval_KO_vs_WT'
+    log10 = True
+
+    def output_name(self, filename, w, mode='exact'):
+        return filename + "_roc_" + window_tag(w, mode) + "_window.csv"
+
+
+class YanoAdapter(ToolAdapter):
+    '''Headerless yanocomp BED-like output, scored on log10 of `pvalue-gtest` at the `start` coordinate.'''
+
+    name = 'yano'
+    sep = '\t'
+    header = None
+    columns = ["chrom", "start", "end", "gene_id", "score", "strand", "mod_log_R", "pvalue-gtest", "FDR-gtest", "ctrl-frac-mod", "treat-frac-mod", "G-stat-treatvsctrl", "homogeneity", "unmod-mean", "unmod-sd", "mod-mean", "mod-sd", "KS-stat"]
+    position_column = 'start'
+    score_column = 'pvalue-gtest'
+    log10 = True
+
+    def output_name(self, filename, w, mode='exact'):
+        directory, base = os.path.split(filename)
+        return os.path.join(directory, "roc_" + window_tag(w, mode) + "_window_" + base + ".tsv")
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (NanodocAdapter(), TomboAdapter(), XporeAdapter(), YanoAdapter())}
+
+
+def get_adapter(tool):
+    '''Look up the adapter for a tool name, e.g. "nanodoc" or "xpore".'''
+
+    try:
+        return ADAPTERS[tool.lower()]
+    except KeyError:
+        raise ValueError("unknown tool " + repr(tool) + ", expected one of " + ", ".join(sorted(ADAPTERS)))
+
+
+## infer tool and rRNA for a file from its name, falling back to its first line
+
+TOOL_PATTERNS = [('nanodoc', r'n(ano)?doc'), ('tombo', r'tombo'), ('xpore', r'xpore'), ('yano', r'yano')]
+
+
+def infer_tool(filename, first_line):
+    name = os.path.basename(filename).lower()
+    for tool, pattern in TOOL_PATTERNS:
+        if re.search(pattern, name):
+            return tool
+
+    if 'pval_KO_vs_WT' in first_line:
+        return 'xpore'
+    if ',' in first_line and re.search(r'\bstat\b', first_line) and re.search(r'\bpos\b', first_line):
+        return 'tombo'
+    fields = first_line.rstrip('\n').split('\t')
+    if len(fields) == len(YanoAdapter.columns):
+        return 'yano'
+    if len(fields) == len(NanodocAdapter.columns):
+        return 'nanodoc'
+
+    raise ValueError("cannot tell which tool wrote " + filename)
+
+
+def infer_rrna(filename, first_line):
+    match = re.search(r'(16|23)s', os.path.basename(filename).lower()) or re.search(r'(16|23)s', first_line.split('\t')[0].lower())
+    if match is None:
+        raise ValueError("cannot tell which rRNA " + filename + " covers")
+    return match.group(1) + 's'
+
+
+def infer_job(filename):
+    '''Return (tool, rrna, filename) for a tool output, e.g. ndoc_16s_1.txt -> ("nanodoc", "16s", ...).'''
+
+    with open(filename) as handle:
+        first_line = handle.readline()
+
+    return infer_tool(filename, first_line), infer_rrna(filename, first_line), filename
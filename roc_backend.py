@@ -0,0 +1,34 @@
+## import libraries
+
+import numpy as np
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
+## array namespace shim - cupy when it is importable and a GPU is visible, numpy otherwise
+
+def gpu_available():
+    '''True when cupy imports and can see at least one CUDA device.'''
+
+    if cupy is None:
+        return False
+    try:
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        return False
+
+
+def get_namespace(gpu=True):
+    '''Return the array module the ROC core should run on.'''
+
+    return cupy if gpu and gpu_available() else np
+
+
+def to_host(array):
+    '''Copy a device array back to numpy in one transfer; numpy arrays pass through.'''
+
+    if cupy is not None and isinstance(array, cupy.ndarray):
+        return cupy.asnumpy(array)
+    return np.asarray(array)
@@ -0,0 +1,69 @@
+## import libraries
+
+import os
+import glob
+import time
+import fire
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from roc_adapters import infer_rrna, infer_tool
+from roc_cache import CACHE_ENABLED
+from roc_cli import run_job
+
+## find tool outputs in a directory or glob, skipping ROC tables written by earlier runs
+
+def find_inputs(path):
+    if os.path.isdir(path):
+        filenames = [os.path.join(path, name) for name in os.listdir(path)]
+    else:
+        filenames = glob.glob(path)
+
+    return sorted(f for f in filenames if os.path.isfile(f) and not is_roc_output(f))
+
+
+def is_roc_output(filename):
+    name = os.path.basename(filename)
+    return name.startswith('roc_') or '_roc_' in name or name.endswith('_manifest.tsv')
+
+
+## run one file in a worker process and report its wall time
+
+def timed_job(filename, w, mode, options):
+    start = time.perf_counter()
+    tool = rrna = output = error = ''
+
+    ## infer tool and rRNA one at a time, so a failed rRNA still leaves the tool in the manifest
+
+    try:
+        with open(filename) as handle:
+            first_line = handle.readline()
+        tool = infer_tool(filename, first_line)
+        rrna = infer_rrna(filename, first_line)
+        output = run_job(tool, rrna, filename, w, mode, **options)
+    except Exception as e:
+        error = str(e)
+
+    return [tool, rrna, filename, output, round(time.perf_counter() - start, 4), 'failed: ' + error if error else 'ok']
+
+
+## define function to fan ROC jobs out over a process pool - e.g. python roc_batch.py '/data/rocs/*_16s_*' --w=2 --workers=64
+
+def batch(path, w=0, workers=None, mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False, float32=False, cache=CACHE_ENABLED, manifest='roc_manifest.tsv'):
+    filenames = find_inputs(path)
+    n = len(filenames)
+    options = dict(collapse=collapse, max_points=max_points, fmt=fmt, summary=summary, max_fpr=max_fpr, bootstrap=bootstrap, metrics=metrics, float32=float32, cache=cache)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(timed_job, filenames, [w] * n, [mode] * n, [options] * n))
+
+    ## write out a manifest of every output with its wall time
+
+    results = pd.DataFrame(rows, columns=["tool", "rrna", "filename", "output", "seconds", "status"])
+    results.to_csv(manifest, sep='\t', index=False)
+
+    print(str((results["status"] == 'ok').sum()) + " of " + str(len(results)) + " files done, manifest in " + manifest)
+
+    return
+
+if __name__ == '__main__':
+  fire.Fire(batch)
@@ -0,0 +1,42 @@
+## import libraries
+
+import time
+import fire
+import numpy as np
+from roc_core import roc_counts
+from roc_jit import roc_counts_jit
+
+## compare the numpy ROC engine with the numba kernel on a synthetic table
+
+def benchmark(n=1000000, positives=0.01, repeats=3, seed=0):
+    rng = np.random.default_rng(seed)
+
+    scores = np.log10(rng.random(n))
+    labels = (rng.random(n) < positives).astype(np.int8)
+    scores[labels == 1] *= 2
+
+    ## first JIT call pays compile time unless the on-disk cache is warm
+
+    start = time.perf_counter()
+    roc_counts_jit(scores[:10], labels[:10])
+    print("jit warm-up: " + str(round(time.perf_counter() - start, 3)) + " s")
+
+    timings = {}
+    results = {}
+
+    for name, function in (("numpy", roc_counts), ("numba", roc_counts_jit)):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[name] = function(scores, labels)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(name + ": " + str(round(best, 3)) + " s for " + str(n) + " rows")
+
+    identical = all(np.array_equal(a, b, equal_nan=True) for a, b in zip(results["numpy"], results["numba"]))
+    print("identical results: " + str(identical))
+
+    return
+
+if __name__ == '__main__':
+  fire.Fire(benchmark)
@@ -0,0 +1,99 @@
+## import libraries
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+## on-disk cache of parsed (position, score) arrays, so re-running a ROC on the same input skips text parsing
+## ROC_CACHE_DIR moves the cache, ROC_CACHE_MAX_BYTES caps its size (least recently used entries go first), ROC_CACHE=0 turns it off
+
+CACHE_DIR = os.environ.get('ROC_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'roc_scripts'))
+CACHE_MAX_BYTES = int(os.environ.get('ROC_CACHE_MAX_BYTES', 10 * 1024 ** 3))
+CACHE_ENABLED = os.environ.get('ROC_CACHE', '1') != '0'
+
+SAMPLE_BYTES = 1024 ** 2
+
+
+def cache_key(filename, tool, score_dtype):
+    '''Key an input by absolute path, size, mtime and a hash of its first and last MiB, plus how it was parsed.
+
+    Hashing the sampled content catches files rewritten in place with the same
+    size and mtime without reading whole transcriptome-scale tables on every hit.
+    '''
+
+    stat = os.stat(filename)
+    digest = hashlib.sha1()
+    digest.update("\t".join([os.path.abspath(filename), str(stat.st_size), str(stat.st_mtime_ns), tool, np.dtype(score_dtype).str]).encode())
+
+    with open(filename, 'rb') as handle:
+        digest.update(handle.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            handle.seek(max(stat.st_size - SAMPLE_BYTES, SAMPLE_BYTES))
+            digest.update(handle.read())
+
+    return digest.hexdigest()
+
+
+def read_cached(adapter, filename, score_dtype=np.float64, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    '''Return (positions, scores) for a tool output, memory-mapped from the cache when it has been parsed before.'''
+
+    entry = os.path.join(cache_dir, cache_key(filename, adapter.name, score_dtype))
+
+    try:
+        positions = np.load(os.path.join(entry, "positions.npy"), mmap_mode='r')
+        scores = np.load(os.path.join(entry, "scores.npy"), mmap_mode='r')
+        os.utime(entry)
+        return positions, scores
+    except (FileNotFoundError, ValueError):
+        pass
+
+    positions, scores = adapter.read(filename, score_dtype=score_dtype)
+
+    ## write into a temporary directory and rename it into place, so concurrent workers never see half an entry
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir, prefix='.staging_')
+    np.save(os.path.join(staging, "positions.npy"), positions)
+    np.save(os.path.join(staging, "scores.npy"), scores)
+
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    evict(cache_dir, max_bytes)
+
+    return positions, scores
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=None):
+    '''Delete least recently used entries until the cache fits in max_bytes, never the entry at path keep.'''
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep or os.path.basename(path).startswith('.staging_') and time.time() - os.path.getmtime(path) < 3600:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def load_scores(adapter, filename, score_dtype=np.float64, cache=CACHE_ENABLED):
+    '''Parse a tool output, going through the cache unless it is turned off.'''
+
+    if cache:
+        return read_cached(adapter, filename, score_dtype)
+    return adapter.read(filename, score_dtype=score_dtype)
@@ -0,0 +1,155 @@
+## import libraries
+
+import os
+import fire
+import numpy as np
+import pandas as pd
+from roc_adapters import get_adapter
+from roc_cache import CACHE_ENABLED, load_scores
+from roc_core import SortedScores, compact_roc, curve_from_counts, write_roc
+from roc_labels import known_mod_labels
+from roc_stats import average_precision, roc_summary, threshold_metrics
+
+## run one (tool, rRNA, file) job and write its ROC table next to the input
+## options: collapse, max_points and fmt shape the ROC table; summary=True also writes AUC/partial AUC (max_fpr), average precision
+## and a bootstrap CI when bootstrap > 0; metrics=True writes precision/recall/F1/MCC per threshold from the same counts
+
+def run_job(tool, rrna, filename, w, mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False, float32=False, cache=CACHE_ENABLED):
+    adapter = get_adapter(tool)
+    positions, scores = load_scores(adapter, filename, np.float32 if float32 else np.float64, cache)
+
+    return run_scores(positions, scores, rrna, adapter.output_name(filename, w, mode), w, mode, collapse, max_points, fmt, summary, max_fpr, bootstrap, metrics)
+
+
+## the same for position/score arrays already in memory (e.g. straight from tombo LevelStats), written to output
+
+def run_scores(positions, scores, rrna, output, w, mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False):
+    labels = known_mod_labels(positions, rrna, w, mode)
+
+    sorted_scores = SortedScores(scores)
+    counts = sorted_scores.counts(labels)
+
+    pivot = curve_from_counts(sorted_scores.thresholds, *counts)
+    output = write_roc(pivot, output, collapse, max_points, fmt)
+    stem = os.path.splitext(output)[0]
+
+    if summary or metrics:
+        table = threshold_metrics(sorted_scores.thresholds, *counts)
+
+    if metrics:
+        table.to_csv(stem + "_metrics.tsv", sep='\t', index=False)
+
+    if summary:
+        stats = roc_summary(scores, labels, max_fpr, bootstrap)
+        stats.insert(0, "window", w)
+        stats["average_precision"] = average_precision(table)
+        stats.to_csv(stem + "_summary.tsv", sep='\t', index=False)
+
+    return output
+
+
+## sweep several windows over one file - parse and sort once, relabel per window
+
+def parse_windows(windows):
+    '''Turn "0..5", "0,2,4" or a list of ints into a list of window sizes.'''
+
+    if isinstance(windows, (list, tuple)):
+        return [int(x) for x in windows]
+    windows = str(windows)
+    if '..' in windows:
+        start, end = windows.split('..')
+        return list(range(int(start), int(end) + 1))
+    return [int(x) for x in windows.split(',')]
+
+
+def run_sweep(tool, rrna, filename, windows, combined=False, mode='exact', collapse=False, max_points=None, fmt='csv', max_fpr=0.1, bootstrap=0, metrics=False, float32=False, cache=CACHE_ENABLED):
+    adapter = get_adapter(tool)
+    positions, scores = load_scores(adapter, filename, np.float32 if float32 else np.float64, cache)
+    sorted_scores = SortedScores(scores)
+
+    outputs = []
+    curves = []
+    summaries = []
+    window_metrics = []
+
+    for w in windows:
+        labels = known_mod_labels(positions, rrna, w, mode)
+        counts = sorted_scores.counts(labels)
+        pivot = curve_from_counts(sorted_scores.thresholds, *counts)
+
+        table = threshold_metrics(sorted_scores.thresholds, *counts)
+        summaries.append(roc_summary(scores, labels, max_fpr, bootstrap).assign(window=w, average_precision=average_precision(table)))
+        if metrics:
+            table.insert(0, "window", w)
+            window_metrics.append(table)
+
+        if combined:
+            curves.append((w, pivot))
+        else:
+            outputs.append(write_roc(pivot, adapter.output_name(filename, w, mode), collapse, max_points, fmt))
+
+    stem = filename + ("_roc_windows" if mode == 'exact' else "_roc_full_windows")
+
+    if combined:
+        output = stem + ".tsv"
+        curves = [compact_roc(pivot, collapse, max_points).assign(window=w) for w, pivot in curves]
+        pd.concat(curves, ignore_index=True)[["window", "tpr", "fpr", "threshold"]].to_csv(output, sep='\t', index=False)
+        outputs.append(output)
+
+    if metrics:
+        output = stem + "_metrics.tsv"
+        pd.concat(window_metrics, ignore_index=True).to_csv(output, sep='\t', index=False)
+        outputs.append(output)
+
+    ## write out the exact AUC, partial AUC and any bootstrap CI for every window
+
+    summary = stem + "_auc.tsv"
+    summaries = pd.concat(summaries, ignore_index=True)
+    summaries[["window"] + [c for c in summaries.columns if c != "window"]].to_csv(summary, sep='\t', index=False)
+    outputs.append(summary)
+
+    return outputs
+
+
+def parse_job(job):
+    '''Split a "tool:rrna:filename" job string into its three parts.'''
+
+    parts = str(job).split(':', 2)
+    if len(parts) != 3:
+        raise ValueError("job " + repr(job) + " is not of the form tool:rrna:filename")
+    return tuple(parts)
+
+
+def read_manifest(manifest):
+    '''Read (tool, rrna, filename) jobs from a tab-separated manifest with those three columns.'''
+
+    jobs = pd.read_csv(manifest, sep='\t', dtype=str)
+    return list(jobs[['tool', 'rrna', 'filename']].itertuples(index=False, name=None))
+
+
+## define one entry point for every tool - e.g. python roc_cli.py nanodoc:16s:ndoc_16s_1.txt xpore:23s:xpore_23s_1.csv --w=2
+## or sweep windows in one pass per file - e.g. python roc_cli.py nanodoc:16s:ndoc_16s_1.txt --windows=0..5 --combined
+## --mode=window labels every position within w nt of a known modification instead of only the exact +-w offsets
+## --collapse keeps one row per distinct threshold, --max_points=500 also thins to hull + evenly spaced points, --fmt=npz|parquet writes binary
+## --summary writes exact AUC and partial AUC up to --max_fpr, average precision and a stratified --bootstrap=1000 CI (sweeps always write it)
+## --metrics writes the precision-recall curve with F1 and MCC at every threshold
+## inputs are streamed in chunks keeping only position and score; --float32 halves the score memory for transcriptome-wide tables
+## parsed inputs are cached as .npy under ROC_CACHE_DIR and memory-mapped on repeat runs; --cache=False skips the cache
+
+def roc(*jobs, w=0, windows=None, combined=False, mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False, float32=False, cache=CACHE_ENABLED, manifest=None):
+    jobs = [parse_job(job) for job in jobs]
+    if manifest is not None:
+        jobs.extend(read_manifest(manifest))
+
+    for tool, rrna, filename in jobs:
+        if windows is None:
+            print(run_job(tool, rrna, filename, w, mode, collapse, max_points, fmt, summary, max_fpr, bootstrap, metrics, float32, cache))
+        else:
+            for output in run_sweep(tool, rrna, filename, parse_windows(windows), combined, mode, collapse, max_points, fmt, max_fpr, bootstrap, metrics, float32, cache):
+                print(output)
+
+    return
+
+
+if __name__ == '__main__':
+  fire.Fire(roc)
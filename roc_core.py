@@ -0,0 +1,205 @@
+## import libraries
+
+import os
+import numpy as np
+import pandas as pd
+from roc_backend import to_host
+
+## shared ROC engine for the *_roc_* scripts - sort the scores once and read TP/FP/FN/TN for every threshold off cumulative label counts
+
+class SortedScores:
+    '''Scores sorted once, so any number of label vectors can be counted against them.
+
+    Thresholds are the absolute scores taken in ascending order of the signed
+    score (the row order the ROC scripts have always written), and a position
+    is called modified when its absolute score is >= the threshold. NaN scores
+    are never called modified, and a NaN threshold calls nothing.
+
+    xp is the array namespace to compute on (numpy by default, or cupy from
+    roc_backend.get_namespace); inputs are moved to it once, up front.
+    '''
+
+    def __init__(self, scores, xp=np):
+        self.xp = xp
+        scores = xp.asarray(scores)
+        if scores.dtype.kind != 'f':
+            scores = scores.astype(xp.float64)
+
+        self.thresholds = xp.abs(scores[xp.argsort(scores, kind='stable')])
+
+        ## sort the absolute scores once and map every threshold to the first sorted position that is called modified
+
+        magnitudes = xp.abs(scores)
+        self.order = xp.argsort(magnitudes, kind='stable')
+        self.n_valid = len(magnitudes) - int(xp.isnan(magnitudes).sum())
+        self.first = xp.minimum(xp.searchsorted(magnitudes[self.order], self.thresholds, side='left'), self.n_valid)
+
+    def counts(self, labels):
+        '''Return TP/FP/FN/TN at every threshold for one label vector.'''
+
+        xp = self.xp
+        labels = xp.asarray(labels).astype(bool)
+        positives_below = xp.concatenate((xp.zeros(1, dtype=xp.int64), xp.cumsum(labels[self.order], dtype=xp.int64)))
+
+        n_pos = int(labels.sum())
+        n_neg = len(labels) - n_pos
+
+        tp = positives_below[self.n_valid] - positives_below[self.first]
+        fp = (self.n_valid - self.first) - tp
+        fn = n_pos - tp
+        tn = n_neg - fp
+
+        return tp, fp, fn, tn
+
+    def curve(self, labels):
+        '''Return a tpr/fpr/threshold dataframe with one row per input row.'''
+
+        return curve_from_counts(self.thresholds, *self.counts(labels))
+
+
+def curve_from_counts(thresholds, tp, fp, fn, tn):
+    '''Turn per-threshold counts into the tpr/fpr/threshold dataframe the ROC scripts write.'''
+
+    thresholds, tp, fp, fn, tn = (to_host(array) for array in (thresholds, tp, fp, fn, tn))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = tp / (tp + fn)
+        fpr = fp / (tn + fp)
+
+    pivot = pd.DataFrame({"tpr": tpr, "fpr": fpr})
+    pivot["threshold"] = thresholds
+
+    return pivot
+
+
+def curve_from_bins(thresholds, pos, neg, n_pos, n_neg):
+    '''ROC table from per-threshold positive/negative counts ordered strictest first, starting at (0, 0).
+
+    pos[k]/neg[k] are the positions first called at thresholds[k]; n_pos and
+    n_neg are the class totals, including any positions that are never called.
+    '''
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = np.concatenate(([0.0], np.cumsum(pos) / n_pos))
+        fpr = np.concatenate(([0.0], np.cumsum(neg) / n_neg))
+
+    return pd.DataFrame({"tpr": tpr, "fpr": fpr, "threshold": np.concatenate(([np.inf], thresholds))})
+
+
+def roc_counts(scores, labels, xp=np):
+    '''Return the thresholds and the TP/FP/FN/TN counts at every threshold.'''
+
+    sorted_scores = SortedScores(scores, xp)
+    return (sorted_scores.thresholds,) + sorted_scores.counts(labels)
+
+
+def roc_curve(scores, labels, xp=np):
+    '''Return a tpr/fpr/threshold dataframe with one row per input row, in O(n log n).'''
+
+    return SortedScores(scores, xp).curve(labels)
+
+
+## compact ROC output - one operating point per distinct threshold, optionally thinned to the convex hull plus evenly spaced points
+
+def collapse_ties(pivot):
+    '''Keep one row per distinct threshold, ordered from the strictest threshold down, starting from (0, 0).
+
+    Tied thresholds always share an operating point, so nothing is lost. The
+    leading row has threshold inf (nothing called modified); NaN thresholds
+    are dropped because they also call nothing.
+    '''
+
+    points = pivot.dropna(subset=["threshold"]).drop_duplicates("threshold").sort_values("threshold", ascending=False, kind='stable')
+    start = pd.DataFrame({"tpr": [0.0], "fpr": [0.0], "threshold": [np.inf]})
+
+    return pd.concat([start, points[["tpr", "fpr", "threshold"]]], ignore_index=True)
+
+
+def convex_hull_indices(fpr, tpr):
+    '''Indices of the ROC convex hull vertices for points already ordered by increasing fpr.'''
+
+    hull = []
+    for i in range(len(fpr)):
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            cross = (fpr[b] - fpr[a]) * (tpr[i] - tpr[a]) - (tpr[b] - tpr[a]) * (fpr[i] - fpr[a])
+            if cross < 0:
+                break
+            hull.pop()
+        hull.append(i)
+
+    return np.asarray(hull, dtype=np.int64)
+
+
+def downsample(pivot, max_points):
+    '''Collapse ties, then keep the convex hull vertices plus evenly spaced points up to max_points rows.
+
+    Hull vertices are always kept, so a curve with more vertices than
+    max_points comes back with just its hull.
+    '''
+
+    points = collapse_ties(pivot)
+    if len(points) <= max_points:
+        return points
+
+    hull = convex_hull_indices(points["fpr"].to_numpy(), points["tpr"].to_numpy())
+    spread = np.linspace(0, len(points) - 1, max(max_points - len(hull), 2)).round().astype(np.int64)
+
+    return points.iloc[np.union1d(hull, spread)].reset_index(drop=True)
+
+
+def compact_roc(pivot, collapse=False, max_points=None):
+    '''Apply the collapse/max_points options shared by the ROC writers.'''
+
+    if max_points is not None:
+        return downsample(pivot, int(max_points))
+    if collapse:
+        return collapse_ties(pivot)
+    return pivot
+
+
+ROC_FORMATS = ('csv', 'npz', 'parquet')
+
+
+def write_roc(pivot, output, collapse=False, max_points=None, fmt='csv'):
+    '''Write a ROC table and return the path written.
+
+    With the defaults the table is written exactly as the ROC scripts always
+    have (every row, pandas index included). collapse/max_points shrink it,
+    and fmt="npz" or "parquet" writes a binary file next to the text name.
+    '''
+
+    if fmt not in ROC_FORMATS:
+        raise ValueError("unknown ROC format " + repr(fmt) + ", expected one of " + ", ".join(ROC_FORMATS))
+
+    pivot = compact_roc(pivot, collapse, max_points)
+
+    if fmt == 'npz':
+        output = os.path.splitext(output)[0] + ".npz"
+        np.savez_compressed(output, tpr=pivot["tpr"].to_numpy(), fpr=pivot["fpr"].to_numpy(), threshold=pivot["threshold"].to_numpy())
+    elif fmt == 'parquet':
+        output = os.path.splitext(output)[0] + ".parquet"
+        pivot.to_parquet(output, index=False)
+    elif collapse or max_points is not None:
+        pivot.to_csv(output, index=False)
+    else:
+        pivot.to_csv(output)
+
+    return output
+
+
+def read_roc(filename):
+    '''Read a ROC table written by write_roc in any of its formats.'''
+
+    if filename.endswith(".npz"):
+        with np.load(filename) as arrays:
+            return pd.DataFrame({"tpr": arrays["tpr"], "fpr": arrays["fpr"], "threshold": arrays["threshold"]})
+    if filename.endswith(".parquet"):
+        return pd.read_parquet(filename)
+
+    ## the legacy ".tsv" ROC tables are comma-separated, so look at the header rather than the extension
+
+    with open(filename) as handle:
+        sep = '\t' if '\t' in handle.readline() else ','
+
+    return pd.read_csv(filename, sep=sep)
@@ -0,0 +1,147 @@
+## import libraries
+
+import os
+import fire
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from roc_core import collapse_ties, convex_hull_indices, read_roc
+
+## colours the figure scripts have always used for the three 16s and three 23s replicates
+
+COLOURS_16S = ['red', 'blue', 'green']
+COLOURS_23S = ['orange', 'purple', 'brown']
+
+
+def curve_auc(pivot):
+    '''AUC label for a ROC table - abs of the trapezoid rule over its rows, rounded to 4 places.'''
+
+    tpr = pivot["tpr"].to_numpy()
+    fpr = pivot["fpr"].to_numpy()
+    return round(abs(float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))), 4)
+
+
+def load_curve(filename):
+    '''Read one ROC table as (AUC, fpr, tpr), the points ordered from the strictest threshold down.
+
+    The AUC comes from the exact AUC in <roc>_summary.tsv when run_job wrote
+    one (--summary); otherwise it is taken over the collapsed points, which
+    stay in threshold order even for per-row tables of mixed-sign scores.
+    '''
+
+    points = collapse_ties(read_roc(filename))
+    summary = os.path.splitext(filename)[0] + "_summary.tsv"
+
+    if os.path.exists(summary):
+        auc = round(float(pd.read_csv(summary, sep='\t')["auc"].iloc[0]), 4)
+    else:
+        auc = curve_auc(points)
+
+    return auc, points["fpr"].to_numpy(), points["tpr"].to_numpy()
+
+
+## thin a curve to what can be seen - the ROC hull vertices plus the first and last point of every run inside one pixel-sized cell
+
+def decimate_curve(fpr, tpr, cell_x, cell_y):
+    '''Indices of the points to draw, in curve order.
+
+    Points are bucketed into cells of cell_x by cell_y data units (one pixel
+    tolerance); only where the curve enters and leaves a cell is kept, so the
+    drawn path changes by less than a cell. Convex hull vertices are always
+    kept, so the hull and its AUC-defining corners survive exactly.
+    '''
+
+    n = len(fpr)
+    if n <= 2:
+        return np.arange(n)
+
+    cells = np.floor(fpr / cell_x) * (1 + np.ceil(1 / cell_y)) + np.floor(tpr / cell_y)
+    change = np.flatnonzero(np.diff(cells) != 0)
+    keep = np.concatenate(([0, n - 1], change, change + 1))
+
+    return np.union1d(keep, staircase_hull(fpr, tpr))
+
+
+def staircase_hull(fpr, tpr):
+    '''Convex hull vertices of a monotone ROC curve (either direction); none for unordered per-row tables.
+
+    Only the first point of each tpr level can be a hull vertex, so the hull
+    is built over those few corners rather than every row.
+    '''
+
+    step_x, step_y = np.diff(fpr), np.diff(tpr)
+    if np.all(step_x >= 0) and np.all(step_y >= 0):
+        order = np.arange(len(fpr))
+    elif np.all(step_x <= 0) and np.all(step_y <= 0):
+        order = np.arange(len(fpr))[::-1]
+    else:
+        return np.empty(0, dtype=np.int64)
+
+    corners = order[np.concatenate(([0], np.flatnonzero(np.diff(tpr[order]) != 0) + 1, [len(order) - 1]))]
+    return corners[convex_hull_indices(fpr[corners], tpr[corners])]
+
+
+## draw one ROC panel on its own figure and close it after saving, so nothing carries over between plots
+## curves are decimated to tolerance pixels before plotting; rasterized=True draws the lines as an embedded image in vector outputs
+
+def render_panel(output, title, files, colours=None, decimate=True, tolerance=0.5, rasterized=False, dpi=300):
+    fig, ax = plt.subplots()
+
+    try:
+        extent = ax.get_window_extent()
+        cell_x = tolerance / extent.width
+        cell_y = tolerance / extent.height
+
+        for i, filename in enumerate(files):
+            auc, fpr, tpr = load_curve(filename)
+            if decimate:
+                points = decimate_curve(fpr, tpr, cell_x, cell_y)
+                fpr, tpr = fpr[points], tpr[points]
+
+            colour = colours[i % len(colours)] if colours else None
+            ax.plot(fpr, tpr, label=str(auc), c=colour, rasterized=rasterized)
+
+        ax.plot([0, 1])
+
+        ax.set_xlabel('false positive rate')
+        ax.set_ylabel('true positive rate')
+        ax.set_title(title)
+        ax.legend()
+
+        fig.savefig(output, dpi=dpi if rasterized else 'figure')
+    finally:
+        plt.close(fig)
+
+    return output
+
+
+def read_figure_manifest(manifest):
+    '''Group a tab-separated manifest (output, title, file and optional colour columns) into one panel per output.'''
+
+    rows = pd.read_csv(manifest, sep='\t', dtype=str)
+    panels = []
+
+    for output, group in rows.groupby("output", sort=False):
+        colours = list(group["colour"]) if "colour" in group and group["colour"].notna().all() else None
+        panels.append((output, group["title"].iloc[0], list(group["file"]), colours))
+
+    return panels
+
+
+## define function to render every panel in a manifest across a process pool - e.g. python roc_figure.py figures.tsv --workers=16 --rasterized
+
+def figures(manifest, workers=None, decimate=True, tolerance=0.5, rasterized=False):
+    panels = read_figure_manifest(manifest)
+    n = len(panels)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for output in executor.map(render_panel, *zip(*panels), [decimate] * n, [tolerance] * n, [rasterized] * n):
+            print(output)
+
+    return
+
+if __name__ == '__main__':
+  fire.Fire(figures)
@@ -0,0 +1,121 @@
+## import libraries
+
+import fire
+import numpy as np
+import pandas as pd
+from roc_adapters import get_adapter, window_tag
+from roc_cli import parse_job
+from roc_core import curve_from_bins
+from roc_labels import known_mod_labels
+from roc_stats import auc_from_bins
+
+## approximate ROC for tables too big to sort - stream chunks into fixed score histograms per class, which add across files
+
+class ScoreHistogram:
+    '''Positive/negative counts of absolute scores in `bins` equal bins over [0, high), plus an overflow bin.
+
+    The ROC read off the histogram is exact at every bin edge, so with width
+    high/bins no threshold is off by more than one bin; auc_from_bins reports
+    the matching AUC error bound. NaN scores (never called) are counted apart.
+    Memory is two arrays of bins + 1 counts, whatever the input size.
+    '''
+
+    def __init__(self, bins=100000, high=100.0):
+        self.bins = int(bins)
+        self.high = float(high)
+        self.pos = np.zeros(self.bins + 1, dtype=np.int64)
+        self.neg = np.zeros(self.bins + 1, dtype=np.int64)
+        self.nan_pos = 0
+        self.nan_neg = 0
+
+    def add(self, scores, labels):
+        magnitudes = np.abs(np.asarray(scores, dtype=np.float64))
+        labels = np.asarray(labels).astype(bool)
+
+        missing = np.isnan(magnitudes)
+        self.nan_pos += int((missing & labels).sum())
+        self.nan_neg += int((missing & ~labels).sum())
+
+        index = np.minimum(np.floor(magnitudes[~missing] * (self.bins / self.high)), self.bins).astype(np.int64)
+        called = labels[~missing]
+        self.pos += np.bincount(index[called], minlength=self.bins + 1)
+        self.neg += np.bincount(index[~called], minlength=self.bins + 1)
+
+    def merge(self, other):
+        if (self.bins, self.high) != (other.bins, other.high):
+            raise ValueError("cannot merge histograms with different bins: " + str((self.bins, self.high)) + " vs " + str((other.bins, other.high)))
+
+        self.pos += other.pos
+        self.neg += other.neg
+        self.nan_pos += other.nan_pos
+        self.nan_neg += other.nan_neg
+
+    def save(self, path):
+        np.savez_compressed(path, bins=self.bins, high=self.high, pos=self.pos, neg=self.neg, nan=np.array([self.nan_pos, self.nan_neg]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            histogram = cls(int(arrays["bins"]), float(arrays["high"]))
+            histogram.pos = arrays["pos"]
+            histogram.neg = arrays["neg"]
+            histogram.nan_pos, histogram.nan_neg = (int(x) for x in arrays["nan"])
+        return histogram
+
+    def curve(self):
+        '''tpr/fpr/threshold at every non-empty bin's lower edge, strictest first.'''
+
+        keep = np.flatnonzero((self.pos + self.neg)[::-1])
+        thresholds = (np.arange(self.bins, -1, -1) * (self.high / self.bins))[keep]
+
+        return curve_from_bins(thresholds, self.pos[::-1][keep], self.neg[::-1][keep], self.pos.sum() + self.nan_pos, self.neg.sum() + self.nan_neg)
+
+    def summary(self):
+        pos = np.concatenate((self.pos[::-1], [self.nan_pos]))
+        neg = np.concatenate((self.neg[::-1], [self.nan_neg]))
+        auc, error = auc_from_bins(pos, neg)
+
+        return pd.DataFrame([{"n_pos": int(pos.sum()), "n_neg": int(neg.sum()), "bins": self.bins, "high": self.high, "auc": auc, "auc_error_bound": error}])
+
+
+## count one or more tool outputs in a single streaming pass each - e.g. python roc_histogram.py count xpore:16s:a.csv xpore:16s:b.csv --w=2
+
+def count(*jobs, w=0, mode='exact', bins=100000, high=100.0, output=None, chunksize=1000000):
+    combined = ScoreHistogram(bins, high)
+
+    for tool, rrna, filename in (parse_job(job) for job in jobs):
+        adapter = get_adapter(tool)
+        histogram = ScoreHistogram(bins, high)
+
+        for positions, scores in adapter.iter_chunks(filename, chunksize):
+            histogram.add(scores, known_mod_labels(positions, rrna, w, mode))
+
+        if output is None:
+            path = filename + "_roc_" + window_tag(w, mode) + "_hist.npz"
+            histogram.save(path)
+            print(path)
+        else:
+            combined.merge(histogram)
+
+    if output is not None:
+        combined.save(output)
+        print(output)
+
+    return
+
+
+## merge any number of histograms into one approximate ROC table and AUC summary - e.g. python roc_histogram.py curve *_hist.npz --output=xpore_16s
+
+def curve(*histograms, output='approx_roc'):
+    merged = ScoreHistogram.load(histograms[0])
+    for path in histograms[1:]:
+        merged.merge(ScoreHistogram.load(path))
+
+    merged.curve().to_csv(output + ".tsv", sep='\t', index=False)
+    merged.summary().to_csv(output + "_summary.tsv", sep='\t', index=False)
+    print(output + ".tsv")
+
+    return
+
+if __name__ == '__main__':
+  fire.Fire({'count': count, 'curve': curve})
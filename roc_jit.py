@@ -0,0 +1,66 @@
+## import libraries
+
+import numba
+import numpy as np
+from roc_core import curve_from_counts
+
+## JIT-compiled threshold sweep - only the numeric core is compiled, sorting and I/O stay in numpy/pandas
+
+@numba.njit(parallel=True, cache=True)
+def sweep_kernel(sorted_magnitudes, sorted_labels, thresholds, n_valid):
+    '''Count TP/FP/FN/TN at every threshold against absolute scores sorted ascending (NaNs last).'''
+
+    n = len(sorted_labels)
+
+    positives_below = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        positives_below[i + 1] = positives_below[i] + sorted_labels[i]
+
+    n_pos = positives_below[n]
+    n_neg = n - n_pos
+
+    tp = np.empty(len(thresholds), dtype=np.int64)
+    fp = np.empty(len(thresholds), dtype=np.int64)
+
+    for j in numba.prange(len(thresholds)):
+        threshold = thresholds[j]
+
+        ## binary search for the first sorted position called modified - a NaN threshold calls nothing
+
+        first = n_valid
+        if threshold == threshold:
+            low = 0
+            high = n_valid
+            while low < high:
+                middle = (low + high) // 2
+                if sorted_magnitudes[middle] < threshold:
+                    low = middle + 1
+                else:
+                    high = middle
+            first = low
+
+        tp[j] = positives_below[n_valid] - positives_below[first]
+        fp[j] = (n_valid - first) - tp[j]
+
+    return tp, fp, n_pos - tp, n_neg - fp
+
+
+def roc_counts_jit(scores, labels):
+    '''Same result as roc_core.roc_counts, with the threshold sweep run by the compiled kernel.'''
+
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels).astype(np.int8)
+
+    thresholds = np.abs(scores[np.argsort(scores, kind='stable')])
+
+    magnitudes = np.abs(scores)
+    order = np.argsort(magnitudes, kind='stable')
+    n_valid = len(magnitudes) - int(np.isnan(magnitudes).sum())
+
+    return (thresholds,) + sweep_kernel(magnitudes[order], labels[order], thresholds, n_valid)
+
+
+def roc_curve_jit(scores, labels):
+    '''Return the tpr/fpr/threshold dataframe using the compiled kernel.'''
+
+    return curve_from_counts(*roc_counts_jit(scores, labels))
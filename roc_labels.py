@@ -0,0 +1,106 @@
+## import libraries
+
+import os
+import json
+import functools
+import numpy as np
+
+## known modified positions live in one versioned registry file - set KNOWN_MODS_REGISTRY to use another copy
+
+REGISTRY_FILE = os.environ.get('KNOWN_MODS_REGISTRY', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'known_mods.json'))
+
+LABEL_MODES = ('exact', 'window')
+
+## label a whole position column with one searchsorted over a merged interval index built once per reference and window
+
+class KnownModLabeler:
+    '''Sorted, merged intervals of positions that count as modified.
+
+    In "exact" mode a position is labelled when it sits on a known
+    modification or exactly w nt either side of one (the behaviour the ROC
+    scripts have always had). In "window" mode every position within w nt of
+    a known modification is labelled.
+    '''
+
+    def __init__(self, known_mods, w, mode='exact'):
+        if mode not in LABEL_MODES:
+            raise ValueError("unknown label mode " + repr(mode) + ", expected one of " + ", ".join(LABEL_MODES))
+
+        known_mods = np.unique(np.asarray(known_mods, dtype=np.int64))
+        w = int(w)
+
+        if mode == 'exact':
+            starts = np.unique(np.concatenate((known_mods, known_mods + w, known_mods - w)))
+            ends = starts
+        else:
+            starts = known_mods - abs(w)
+            ends = known_mods + abs(w)
+
+        ## merge overlapping or touching intervals so a single searchsorted finds the only candidate
+
+        if len(starts):
+            heads = np.concatenate(([0], np.flatnonzero(starts[1:] > np.maximum.accumulate(ends)[:-1] + 1) + 1))
+            starts, ends = starts[heads], np.maximum.reduceat(ends, heads)
+
+        self.starts = starts
+        self.ends = ends
+
+    def label(self, positions):
+        '''Return an int8 array with 1 for modified positions and 0 everywhere else.'''
+
+        positions = np.asarray(positions)
+        index = np.searchsorted(self.starts, positions, side='right') - 1
+        inside = index >= 0
+        inside[inside] = positions[inside] <= self.ends[index[inside]]
+        return inside.astype(np.int8)
+
+
+## registry lookups - references are matched case-insensitively and aliases say which coordinates they share
+
+@functools.lru_cache(maxsize=None)
+def load_registry(path=REGISTRY_FILE):
+    '''Read the registry into {"version", "references", "aliases"} with lower-cased names.'''
+
+    with open(path) as handle:
+        registry = json.load(handle)
+
+    return {
+        "version": registry["version"],
+        "references": {name.lower(): tuple(positions) for name, positions in registry["references"].items()},
+        "aliases": {name.lower(): (alias["reference"].lower(), int(alias.get("offset", 0))) for name, alias in registry.get("aliases", {}).items()},
+    }
+
+
+def known_mods(reference, path=REGISTRY_FILE):
+    '''Return the known modified positions of a reference (or alias) in that reference's own coordinates.'''
+
+    registry = load_registry(path)
+    name = reference.lower()
+    offset = 0
+
+    if name in registry["aliases"]:
+        name, offset = registry["aliases"][name]
+
+    if name not in registry["references"]:
+        raise KeyError("reference " + repr(reference) + " is not in the known modification registry " + path)
+
+    return np.asarray(registry["references"][name], dtype=np.int64) + offset
+
+
+@functools.lru_cache(maxsize=None)
+def get_labeler(reference, w, mode='exact', path=REGISTRY_FILE):
+    '''Labeler for one (reference, window, mode), built once per process.'''
+
+    return KnownModLabeler(known_mods(reference, path), w, mode)
+
+
+def known_mod_labels(positions, reference, w, mode='exact'):
+    '''Label a position column against the known modifications of one reference.'''
+
+    return get_labeler(reference.lower(), int(w), mode).label(positions)
+
+
+def known_mod_mask(reference, w, length, mode='exact'):
+    '''Boolean mask over coordinates 0..length-1 of one reference, True where a position counts as modified.'''
+
+    return get_labeler(reference.lower(), int(w), mode).label(np.arange(length)).astype(bool)
@@ -0,0 +1,114 @@
+## import libraries
+
+import os
+import fire
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from roc_adapters import infer_rrna, infer_tool
+from roc_figure import COLOURS_16S, COLOURS_23S, decimate_curve, load_curve, plt
+
+## titles the figure scripts have always used for each tool
+
+TOOL_TITLES = {'nanodoc': 'nanodoc', 'tombo': 'Tombo', 'xpore': 'xPore', 'yano': 'Yanocomp'}
+
+
+def parse_replicate(spec):
+    '''Return (tool, rrna, filename) for "tool:rrna:filename" or a ROC file whose name says its tool and rRNA.'''
+
+    parts = str(spec).split(':', 2)
+    if len(parts) == 3 and not os.path.exists(spec):
+        return parts[0].lower(), parts[1].lower(), parts[2]
+
+    return infer_tool(spec, ''), infer_rrna(spec, ''), spec
+
+
+## put every replicate on one fpr grid with a single np.interp - curve r is shifted to [2r, 2r + 1] so the curves never meet
+
+def interpolate_curves(curves, grid):
+    '''Return a replicates x len(grid) array of tpr values.
+
+    Each curve is extended flat to fpr 1 (positions with NaN scores are never
+    called, so a curve can stop short); curves without negatives give NaN rows.
+    '''
+
+    xs, ys, shifts = [], [], []
+    for r, (fpr, tpr) in enumerate(curves):
+        if len(fpr) == 0 or np.isnan(fpr).any() or np.isnan(tpr).any():
+            fpr, tpr = np.array([0.0, 1.0]), np.full(2, np.nan)
+        xs.append(np.concatenate((fpr, [1.0])) + 2 * r)
+        ys.append(np.concatenate((tpr, tpr[-1:])))
+        shifts.append(2 * r)
+
+    queries = np.asarray(grid)[None, :] + np.asarray(shifts, dtype=np.float64)[:, None]
+    return np.interp(queries.ravel(), np.concatenate(xs), np.concatenate(ys)).reshape(queries.shape)
+
+
+## one panel per (tool, rRNA) - every replicate with its AUC, plus the mean tpr +- one sd over a common fpr grid
+
+def replicates(*files, output='roc_replicates.pdf', columns=2, workers=None, grid=1001, tolerance=0.5, rasterized=False, dpi=300):
+    jobs = [parse_replicate(spec) for spec in files]
+
+    groups = {}
+    for tool, rrna, filename in jobs:
+        groups.setdefault((tool, rrna), []).append(filename)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        loaded = dict(zip([filename for _, _, filename in jobs], executor.map(load_curve, [filename for _, _, filename in jobs])))
+
+    columns = max(1, min(int(columns), len(groups)))
+    rows = -(-len(groups) // columns)
+    fig, axes = plt.subplots(rows, columns, figsize=(6.4 * columns, 4.8 * rows), squeeze=False)
+    fpr_grid = np.linspace(0, 1, int(grid))
+    summary = []
+
+    try:
+        for ax, ((tool, rrna), filenames) in zip(axes.ravel(), groups.items()):
+            colours = COLOURS_23S if rrna == '23s' else COLOURS_16S
+            if len(filenames) > len(colours):
+                colours = plt.cm.viridis(np.linspace(0, 0.9, len(filenames)))
+            extent = ax.get_window_extent()
+
+            for i, filename in enumerate(filenames):
+                auc, fpr, tpr = loaded[filename]
+                points = decimate_curve(fpr, tpr, tolerance / extent.width, tolerance / extent.height)
+                ax.plot(fpr[points], tpr[points], label=str(auc), c=colours[i % len(colours)], lw=0.8, alpha=0.7, rasterized=rasterized)
+                summary.append({"tool": tool, "rrna": rrna, "file": filename, "auc": auc})
+
+            tpr_grid = interpolate_curves([loaded[filename][1:] for filename in filenames], fpr_grid)
+            mean = np.nanmean(tpr_grid, axis=0)
+            sd = np.nanstd(tpr_grid, axis=0)
+            aucs = np.array([loaded[filename][0] for filename in filenames])
+
+            ax.fill_between(fpr_grid, np.clip(mean - sd, 0, 1), np.clip(mean + sd, 0, 1), color='grey', alpha=0.3, lw=0, rasterized=rasterized)
+            ax.plot(fpr_grid, mean, c='black', label="mean " + str(round(aucs.mean(), 4)) + " +- " + str(round(aucs.std(), 4)))
+            ax.plot([0, 1], ls='--', c='grey')
+
+            ax.set_xlabel('false positive rate')
+            ax.set_ylabel('true positive rate')
+            ax.set_title("ROC curve for " + TOOL_TITLES.get(tool, tool) + " - " + rrna + " rRNA")
+            ax.legend(fontsize='x-small', loc='lower right', ncol=-(-(len(filenames) + 1) // 12))
+
+        for ax in axes.ravel()[len(groups):]:
+            ax.set_visible(False)
+
+        fig.tight_layout()
+        fig.savefig(output, dpi=dpi if rasterized else 'figure')
+    finally:
+        plt.close(fig)
+
+    ## write out the per-replicate AUCs beside the figure
+
+    table = os.path.splitext(output)[0] + "_auc.tsv"
+    pd.DataFrame(summary).to_csv(table, sep='\t', index=False)
+
+    print(output)
+    print(table)
+
+    return
+
+
+## e.g. python roc_replicates.py ndoc_16s_*_roc_2nt_window.tsv xpore:23s:run1.csv_roc_2nt_window.csv --output=replicates.pdf --columns=3
+
+if __name__ == '__main__':
+  fire.Fire(replicates)
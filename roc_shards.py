@@ -0,0 +1,114 @@
+## import libraries
+
+import fire
+import numpy as np
+import pandas as pd
+from roc_adapters import get_adapter, window_tag
+from roc_cli import parse_job
+from roc_core import curve_from_bins
+from roc_labels import known_mod_labels
+from roc_stats import auc_from_bins
+
+## exact mergeable ROC statistic - positive/negative counts per distinct absolute score, which add across shards without losing anything
+
+def group_counts(thresholds, pos, neg):
+    '''Sum pos/neg over equal thresholds and return them sorted strictest first, NaN (never called) last.'''
+
+    unique, inverse = np.unique(-np.asarray(thresholds, dtype=np.float64), return_inverse=True)
+    inverse = inverse.ravel()
+
+    return -unique, np.bincount(inverse, weights=pos, minlength=len(unique)).astype(np.int64), np.bincount(inverse, weights=neg, minlength=len(unique)).astype(np.int64)
+
+
+class ThresholdCounts:
+    '''Sorted distinct absolute scores with the number of positive and negative positions at each.
+
+    This is a sufficient statistic for the exact ROC curve and AUC: shards of
+    any size reduce to it and add up to the global result. Chunks are grouped
+    as they arrive and compacted whenever the pending groups outgrow the
+    compacted ones, so streaming a shard stays O(n log n).
+    '''
+
+    def __init__(self):
+        self.thresholds = np.empty(0, dtype=np.float64)
+        self.pos = np.empty(0, dtype=np.int64)
+        self.neg = np.empty(0, dtype=np.int64)
+        self.pending = []
+
+    def add(self, scores, labels):
+        labels = np.asarray(labels).astype(bool)
+        self.add_counts(np.abs(np.asarray(scores, dtype=np.float64)), labels.astype(np.int64), (~labels).astype(np.int64))
+
+    def add_counts(self, thresholds, pos, neg):
+        self.pending.append(group_counts(thresholds, pos, neg))
+        if sum(len(group[0]) for group in self.pending) > len(self.thresholds):
+            self.compact()
+
+    def compact(self):
+        if self.pending:
+            groups = [(self.thresholds, self.pos, self.neg)] + self.pending
+            self.thresholds, self.pos, self.neg = group_counts(*(np.concatenate(part) for part in zip(*groups)))
+            self.pending = []
+        return self
+
+    def merge(self, other):
+        other.compact()
+        self.add_counts(other.thresholds, other.pos, other.neg)
+
+    def save(self, path):
+        self.compact()
+        np.savez_compressed(path, threshold=self.thresholds, pos=self.pos, neg=self.neg)
+
+    @classmethod
+    def load(cls, path):
+        counts = cls()
+        with np.load(path) as arrays:
+            counts.thresholds, counts.pos, counts.neg = arrays["threshold"], arrays["pos"], arrays["neg"]
+        return counts
+
+    def curve(self):
+        '''Exact tpr/fpr/threshold at every distinct threshold, strictest first.'''
+
+        self.compact()
+        called = ~np.isnan(self.thresholds)
+        return curve_from_bins(self.thresholds[called], self.pos[called], self.neg[called], self.pos.sum(), self.neg.sum())
+
+    def summary(self):
+        self.compact()
+        auc, _ = auc_from_bins(self.pos, self.neg)
+        return pd.DataFrame([{"n_pos": int(self.pos.sum()), "n_neg": int(self.neg.sum()), "thresholds": len(self.thresholds), "auc": auc}])
+
+
+## count one shard per tool output - e.g. python roc_shards.py count nanodoc:16s:shard_01.txt --w=2
+
+def count(*jobs, w=0, mode='exact', chunksize=1000000):
+    for tool, rrna, filename in (parse_job(job) for job in jobs):
+        adapter = get_adapter(tool)
+        counts = ThresholdCounts()
+
+        for positions, scores in adapter.iter_chunks(filename, chunksize):
+            counts.add(scores, known_mod_labels(positions, rrna, w, mode))
+
+        path = filename + "_roc_" + window_tag(w, mode) + "_counts.npz"
+        counts.save(path)
+        print(path)
+
+    return
+
+
+## merge any number of shards into the exact global ROC table and AUC - e.g. python roc_shards.py merge node*/*_counts.npz --output=nanodoc_16s
+
+def merge(*shards, output='merged_roc'):
+    merged = ThresholdCounts.load(shards[0])
+    for path in shards[1:]:
+        merged.merge(ThresholdCounts.load(path))
+
+    merged.save(output + "_counts.npz")
+    merged.curve().to_csv(output + ".tsv", sep='\t', index=False)
+    merged.summary().to_csv(output + "_summary.tsv", sep='\t', index=False)
+    print(output + ".tsv")
+
+    return
+
+if __name__ == '__main__':
+  fire.Fire({'count': count, 'merge': merge})
@@ -0,0 +1,193 @@
+## import libraries
+
+import numpy as np
+import pandas as pd
+
+## summary statistics computed straight from the score/label arrays, so plotting never has to re-read full ROC curves
+
+def ranking_scores(scores):
+    '''Absolute scores as the ROC scripts rank them - NaN positions are never called, so they rank lowest.'''
+
+    magnitudes = np.abs(np.asarray(scores, dtype=np.float64))
+    magnitudes[np.isnan(magnitudes)] = -np.inf
+    return magnitudes
+
+
+def dense_ranks(values):
+    '''Return integer ranks 0..U-1 with ties sharing a rank, and U.'''
+
+    unique, ranks = np.unique(values, return_inverse=True)
+    return ranks.ravel(), len(unique)
+
+
+def exact_auc(scores, labels):
+    '''AUC from ranks (Mann-Whitney U), ties counting one half; NaN when either class is empty.'''
+
+    values = ranking_scores(scores)
+    labels = np.asarray(labels).astype(bool)
+
+    n_pos = int(labels.sum())
+    n_neg = len(labels) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+
+    ## average rank of every tie group, from the group's first position and size
+
+    ranks, n_unique = dense_ranks(values)
+    sizes = np.bincount(ranks, minlength=n_unique)
+    average_rank = np.cumsum(sizes) - (sizes - 1) / 2
+
+    u = average_rank[ranks[labels]].sum() - n_pos * (n_pos + 1) / 2
+    return float(u / (n_pos * n_neg))
+
+
+def auc_from_bins(pos, neg):
+    '''Mann-Whitney AUC from positive/negative counts per score group ordered strictest first.
+
+    Positions in the same group count as ties (one half). Also returns the
+    most that splitting every group could move the AUC, which is zero when
+    each group holds a single distinct score.
+    '''
+
+    pos = np.asarray(pos, dtype=np.float64)
+    neg = np.asarray(neg, dtype=np.float64)
+    n_pos, n_neg = pos.sum(), neg.sum()
+    if n_pos == 0 or n_neg == 0:
+        return float('nan'), float('nan')
+
+    negatives_below = n_neg - np.cumsum(neg)
+    u = np.sum(pos * (negatives_below + neg / 2))
+
+    return float(u / (n_pos * n_neg)), float(np.sum(pos * neg) / (2 * n_pos * n_neg))
+
+
+def operating_points(scores, labels):
+    '''fpr/tpr at every distinct threshold from the strictest down, starting at (0, 0) and ending at (1, 1).'''
+
+    values = ranking_scores(scores)
+    labels = np.asarray(labels).astype(bool)
+
+    order = np.argsort(-values, kind='stable')
+    values = values[order]
+    tp = np.cumsum(labels[order])
+    fp = np.arange(1, len(values) + 1) - tp
+
+    ## the last row of each tie group holds the counts for that threshold
+
+    last = np.concatenate((np.flatnonzero(values[1:] != values[:-1]), [len(values) - 1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = np.concatenate(([0.0], tp[last] / tp[-1]))
+        fpr = np.concatenate(([0.0], fp[last] / fp[-1]))
+
+    return fpr, tpr
+
+
+def partial_auc(scores, labels, max_fpr=0.1):
+    '''Area under the ROC curve between fpr 0 and max_fpr, interpolating linearly at the cap.'''
+
+    fpr, tpr = operating_points(scores, labels)
+    if np.isnan(fpr).any() or np.isnan(tpr).any():
+        return float('nan')
+
+    cut = np.searchsorted(fpr, max_fpr, side='right')
+    x = np.concatenate((fpr[:cut], [max_fpr]))
+    y = np.concatenate((tpr[:cut], [np.interp(max_fpr, fpr, tpr)]))
+
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+
+def bootstrap_auc(scores, labels, n_bootstrap=1000, ci=0.95, seed=0, batch_elements=20000000):
+    '''Stratified bootstrap confidence interval for the exact AUC.
+
+    Positives and negatives are resampled separately, so every replicate keeps
+    the original class sizes. Replicates run in batches: scores become dense
+    ranks, each batch's resampled negatives are histogrammed over ranks with
+    one bincount, and every resampled positive reads its wins off the
+    cumulative histogram. batch_elements caps the histogram size per batch.
+    '''
+
+    values = ranking_scores(scores)
+    labels = np.asarray(labels).astype(bool)
+
+    n_pos = int(labels.sum())
+    n_neg = len(labels) - n_pos
+    if n_pos == 0 or n_neg == 0 or n_bootstrap <= 0:
+        return float('nan'), float('nan')
+
+    ranks, n_unique = dense_ranks(values)
+    positive_ranks = ranks[labels]
+    negative_ranks = ranks[~labels]
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(n_bootstrap, batch_elements // max(n_unique, n_pos, n_neg)))
+    aucs = []
+
+    for done in range(0, n_bootstrap, batch):
+        size = min(batch, n_bootstrap - done)
+        offsets = (np.arange(size) * n_unique)[:, None]
+
+        negatives = negative_ranks[rng.integers(0, n_neg, (size, n_neg))] + offsets
+        counts = np.bincount(negatives.ravel(), minlength=size * n_unique).reshape(size, n_unique)
+        below = np.cumsum(counts, axis=1) - counts
+
+        positives = positive_ranks[rng.integers(0, n_pos, (size, n_pos))]
+        rows = np.arange(size)[:, None]
+        wins = below[rows, positives] + counts[rows, positives] / 2
+
+        aucs.append(wins.sum(axis=1) / (n_pos * n_neg))
+
+    aucs = np.concatenate(aucs)
+    tail = (1 - ci) / 2
+
+    return float(np.quantile(aucs, tail)), float(np.quantile(aucs, 1 - tail))
+
+
+## precision-recall and per-threshold metrics, read off the same cumulative TP/FP/FN/TN counts as the ROC curve
+
+def threshold_metrics(thresholds, tp, fp, fn, tn):
+    '''One row per distinct threshold, strictest first, with counts, precision, recall, F1 and MCC.
+
+    Takes the arrays from SortedScores.counts, so no extra pass over the data
+    is needed. Precision is NaN where nothing is called; NaN thresholds are
+    dropped because they call nothing.
+    '''
+
+    table = pd.DataFrame({"threshold": thresholds, "tp": tp, "fp": fp, "fn": fn, "tn": tn})
+    table = table.dropna(subset=["threshold"]).drop_duplicates("threshold").sort_values("threshold", ascending=False, kind='stable').reset_index(drop=True)
+
+    tp, fp, fn, tn = (table[column].to_numpy(dtype=np.float64) for column in ("tp", "fp", "fn", "tn"))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table["precision"] = tp / (tp + fp)
+        table["recall"] = tp / (tp + fn)
+        table["f1"] = 2 * tp / (2 * tp + fp + fn)
+        table["mcc"] = (tp * tn - fp * fn) / np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
+
+    return table
+
+
+def average_precision(metrics):
+    '''Average precision from a threshold_metrics table - precision weighted by each step in recall.'''
+
+    recall = np.concatenate(([0.0], metrics["recall"].to_numpy()))
+    precision = np.nan_to_num(metrics["precision"].to_numpy())
+    return float(np.sum(np.diff(recall) * precision))
+
+
+def roc_summary(scores, labels, max_fpr=0.1, n_bootstrap=0, ci=0.95, seed=0):
+    '''One-row dataframe with n_pos, n_neg, exact AUC, partial AUC and (when n_bootstrap > 0) its CI.'''
+
+    labels = np.asarray(labels).astype(bool)
+    low, high = bootstrap_auc(scores, labels, n_bootstrap, ci, seed)
+
+    return pd.DataFrame([{
+        "n_pos": int(labels.sum()),
+        "n_neg": int((~labels).sum()),
+        "auc": exact_auc(scores, labels),
+        "max_fpr": max_fpr,
+        "pauc": partial_auc(scores, labels, max_fpr),
+        "bootstraps": int(n_bootstrap),
+        "ci": ci,
+        "auc_low": low,
+        "auc_high": high,
+    }])
@@ -0,0 +1,101 @@
+## import libraries
+
+import os
+import json
+import fire
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from tombo import tombo_stats
+
+## regions to pull from each tombo stats file live in one config - set TOMBO_REGIONS to use another copy
+## keys are matched against stats file names (e.g. "a8_16s"), each mapping to one or more (reference, strand, start, end) regions
+
+REGIONS_FILE = os.environ.get('TOMBO_REGIONS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tombo_regions.json'))
+
+
+def load_regions(path=REGIONS_FILE):
+    '''Read the config into {key: [(reference, strand, start, end), ...]}.'''
+
+    with open(path) as handle:
+        config = json.load(handle)
+
+    return {key: [(region["reference"], region.get("strand", '+'), int(region["start"]), int(region["end"])) for region in regions]
+            for key, regions in config["regions"].items()}
+
+
+def match_regions(filename, regions):
+    '''Every region whose key appears in the file name, in config order.'''
+
+    matched = []
+    for key, key_regions in regions.items():
+        if key in filename:
+            matched.extend(region for region in key_regions if region not in matched)
+    return matched
+
+
+def region_csv(filename, region, single=True):
+    '''CSV name for one region of a stats file - the old "<stats file>.csv" when the file has just the one region.'''
+
+    if single:
+        return filename + ".csv"
+
+    reference, strand, start, end = region
+    return filename + "_" + reference + ("_minus" if strand == '-' else "") + "_" + str(start) + "-" + str(end) + ".csv"
+
+
+def parse_region(region):
+    '''Turn "reference:strand:start:end" into a region tuple.'''
+
+    reference, strand, start, end = str(region).rsplit(':', 3)
+    return reference, strand, int(start), int(end)
+
+
+def region_scores(reg_level_stats):
+    '''int32 positions and log10 stat scores from a get_reg_stats structured array, as the tombo ROC scripts read them from CSV.'''
+
+    with np.errstate(divide='ignore'):
+        return reg_level_stats['pos'].astype(np.int32), np.log10(reg_level_stats['stat'].astype(np.float64))
+
+
+## open each stats file once and pull all of its regions from the same LevelStats
+
+def extract_file(statsfile, regions, output_dir='.'):
+    '''Write one CSV per region of a tombo stats file and return their paths.'''
+
+    sample_level_stats = tombo_stats.LevelStats(statsfile)
+    filename = os.path.basename(statsfile)
+    outputs = []
+
+    for region in regions:
+        reg_level_stats = sample_level_stats.get_reg_stats(*region)
+        output = os.path.join(output_dir, region_csv(filename, region, len(regions) == 1))
+        pd.DataFrame(reg_level_stats).to_csv(output)
+        outputs.append(output)
+
+    return outputs
+
+
+## define function to extract every configured region from a directory of stats files across a process pool
+## e.g. python tombo_regions.py /data/bhargava/filteredrnamods/tombostats/ --workers=16 --config=tombo_regions.json
+
+def extract(directory, config=REGIONS_FILE, workers=None, output_dir='.'):
+    regions = load_regions(config)
+
+    jobs = []
+    for filename in sorted(os.listdir(directory)):
+        file_regions = match_regions(filename, regions)
+        if file_regions:
+            jobs.append((os.path.join(directory, filename), file_regions))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (statsfile, _), outputs in zip(jobs, executor.map(extract_file, *zip(*jobs), [output_dir] * len(jobs))):
+            print(statsfile)
+            for output in outputs:
+                print(output)
+
+    return
+
+
+if __name__ == '__main__':
+  fire.Fire(extract)
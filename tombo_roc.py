@@ -0,0 +1,74 @@
+## import libraries
+
+import os
+import fire
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from tombo import tombo_stats
+from roc_adapters import get_adapter
+from roc_cli import run_scores
+from tombo_regions import REGIONS_FILE, load_regions, match_regions, parse_region, region_csv, region_scores
+
+## ROC straight from tombo stats files - the get_reg_stats array goes into the ROC engine without a CSV round-trip
+## ROC tables keep the names the CSV route gives them (roc_<w>nt_window_<stats file>.csv), so either route feeds the same figures
+
+def roc_file(statsfile, regions, w, rrna=None, csv=False, output_dir='.', mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False):
+    '''Write the ROC table of every region of one stats file and return the paths written.
+
+    Each region is labelled against its own reference name in the known
+    modification registry unless rrna is given; csv=True also writes the
+    region CSV the extraction scripts produce.
+    '''
+
+    sample_level_stats = tombo_stats.LevelStats(statsfile)
+    filename = os.path.basename(statsfile)
+    adapter = get_adapter('tombo')
+    outputs = []
+
+    for region in regions:
+        reg_level_stats = sample_level_stats.get_reg_stats(*region)
+        name = os.path.join(output_dir, region_csv(filename, region, len(regions) == 1))
+
+        if csv:
+            pd.DataFrame(reg_level_stats).to_csv(name)
+            outputs.append(name)
+
+        positions, scores = region_scores(reg_level_stats)
+        outputs.append(run_scores(positions, scores, rrna or region[0], adapter.output_name(name, w, mode), w, mode, collapse, max_points, fmt, summary, max_fpr, bootstrap, metrics))
+
+    return outputs
+
+
+## define function to run stats files (or directories of them) across a process pool - regions come from tombo_regions.json
+## e.g. python tombo_roc.py /data/bhargava/filteredrnamods/tombostats/ --w=2 --workers=16
+## or name the region and label reference - e.g. python tombo_roc.py sample.tombo.stats --region=16s_88_rrsE:+:1:1813 --rrna=16s --csv
+
+def roc(*paths, w=0, region=None, rrna=None, csv=False, config=REGIONS_FILE, workers=None, output_dir='.', mode='exact', collapse=False, max_points=None, fmt='csv', summary=False, max_fpr=0.1, bootstrap=0, metrics=False):
+    regions = None if region is not None else load_regions(config)
+
+    statsfiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            statsfiles.extend(os.path.join(path, filename) for filename in sorted(os.listdir(path)))
+        else:
+            statsfiles.append(path)
+
+    jobs = []
+    for statsfile in statsfiles:
+        file_regions = [parse_region(region)] if region is not None else match_regions(os.path.basename(statsfile), regions)
+        if file_regions:
+            jobs.append((statsfile, file_regions))
+
+    options = (w, rrna, csv, output_dir, mode, collapse, max_points, fmt, summary, max_fpr, bootstrap, metrics)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(roc_file, statsfile, file_regions, *options) for statsfile, file_regions in jobs]
+        for future in futures:
+            for output in future.result():
+                print(output)
+
+    return
+
+
+if __name__ == '__main__':
+  fire.Fire(roc)
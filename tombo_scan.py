@@ -0,0 +1,97 @@
+## import libraries
+
+import os
+import fire
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from tombo import tombo_stats
+
+## whole-transcriptome scan of a tombo stats file - every reference on both strands, pulled in fixed-size windows
+## and streamed into one table with reference and strand columns, so memory never holds more than one window of stats
+
+SCAN_FORMATS = ('parquet', 'tsv')
+
+
+def stat_windows(sample_level_stats, window=100000):
+    '''Yield (reference, strand, start, end) for every window that holds statistics, references in sorted order.
+
+    Windows are taken from the stats file's own block index, so stretches of a
+    reference without any statistics are never queried.
+    '''
+
+    region_size = sample_level_stats.region_size
+
+    for (reference, strand), blocks in sorted(sample_level_stats.blocks_index.items()):
+        starts = np.asarray(sorted(blocks), dtype=np.int64)
+        first = starts // window
+        last = (starts + region_size - 1) // window
+        covered = np.unique(np.concatenate([np.arange(a, b + 1) for a, b in zip(first, last)]))
+
+        for k in covered:
+            yield reference, strand, int(k * window), int((k + 1) * window)
+
+
+def window_table(reference, strand, reg_level_stats):
+    '''One window of get_reg_stats output as a dataframe led by its reference and strand.'''
+
+    table = pd.DataFrame(reg_level_stats)
+    table.insert(0, "strand", strand)
+    table.insert(0, "reference", reference)
+    return table
+
+
+def scan_file(statsfile, output, window=100000, fmt='parquet'):
+    '''Stream every window of one stats file into output (a parquet row group or a block of TSV lines per window).'''
+
+    if fmt not in SCAN_FORMATS:
+        raise ValueError("unknown scan format " + repr(fmt) + ", expected one of " + ", ".join(SCAN_FORMATS))
+
+    if fmt == 'parquet':
+        import pyarrow
+        import pyarrow.parquet
+
+    sample_level_stats = tombo_stats.LevelStats(statsfile)
+    writer = None
+    header = True
+    rows = 0
+
+    try:
+        for reference, strand, start, end in stat_windows(sample_level_stats, window):
+            reg_level_stats = sample_level_stats.get_reg_stats(reference, strand, start, end)
+            if len(reg_level_stats) == 0:
+                continue
+
+            table = window_table(reference, strand, reg_level_stats)
+            rows += len(table)
+
+            if fmt == 'parquet':
+                batch = pyarrow.Table.from_pandas(table, preserve_index=False)
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(output, batch.schema)
+                writer.write_table(batch)
+            else:
+                table.to_csv(output, sep='\t', index=False, mode='w' if header else 'a', header=header)
+                header = False
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return output, rows
+
+
+## define function to scan stats files across a process pool, one output per stats file
+## e.g. python tombo_scan.py sample1.tombo.stats sample2.tombo.stats --window=100000 --workers=8 --fmt=tsv
+
+def scan(*statsfiles, window=100000, fmt='parquet', output_dir='.', workers=None):
+    outputs = [os.path.join(output_dir, os.path.basename(statsfile) + "_scan." + fmt) for statsfile in statsfiles]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for output, rows in executor.map(scan_file, statsfiles, outputs, [int(window)] * len(outputs), [fmt] * len(outputs)):
+            print(output + "\t" + str(rows))
+
+    return
+
+
+if __name__ == '__main__':
+  fire.Fire(scan)
@@ -1,21 +1,17 @@
 ## import libraries
 
+import os
 import fire
-from tombo import tombo_helper, tombo_stats, resquiggle
-import pandas as pd
+from tombo_regions import extract_file
 
-## define function to generalize the CSV generation for ROC curve generation for 16s rRNA
+## define function to generalize the CSV generation for ROC curve generation for 23s rRNA
 
 
 def extract(statsfile):
     
-    # read in the output file from xpore analysis for 16s rRNA
+    # pull the 23s rRNA region out of the tombo stats file and write it next to the stats file
 
-    sample_level_stats = tombo_stats.LevelStats(statsfile)
-    
-    reg_level_stats = sample_level_stats.get_reg_stats('23s_78_rrlB', '+', 1, 3163)
-    
-    pd.DataFrame(reg_level_stats).to_csv(statsfile + ".csv")
+    extract_file(statsfile, [('23s_78_rrlB', '+', 1, 3163)], os.path.dirname(statsfile))
 
     return
 